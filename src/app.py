@@ -1,10 +1,28 @@
+import numba as nb
+import numpy as np
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import xlsxwriter as xw
 
 import argparse as ap
 import magic as mg
 import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing as mp
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
+
+
+# Texts read as empty cells by `pd.read_csv`, used by the pyarrow CSV readers
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
 
 
 def get_system_args() -> ap.Namespace:
@@ -97,10 +115,32 @@ def get_system_args() -> ap.Namespace:
         help='Save the output file as an Excel spreadsheet.',
         action='store_true'
     )
+    # Both index columns are already sorted
+    parser.add_argument(
+        '-s',
+        '--sorted-keys',
+        help='Both index columns are sorted, use an ordered merge.',
+        action='store_true'
+    )
+    # Number of processes for the lazy load chunks
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help='Processes used to read the origin chunks (default: CPU count).',
+        type=int,
+        default=None
+    )
+    # Dataframe engine
+    parser.add_argument(
+        '--engine',
+        help='Dataframe engine used to process the files (default: pandas).',
+        choices=['pandas', 'polars', 'arrow'],
+        default='pandas'
+    )
     return parser.parse_args()
 
 
-def avoid_similar_columns(column_name: str, column_list: list) -> str:
+def avoid_similar_columns(column_name: str, column_set: set) -> str:
     """
     avoid_similar_columns
     ---------------------
@@ -108,27 +148,142 @@ def avoid_similar_columns(column_name: str, column_list: list) -> str:
     here to avoid that (as the name says), returning a brand new name for every
     time this exact name repeats. E.G:
         repeated_name | repeated_name_2 | repeated_name_3
+    The new name is added to `column_set`, so the next calls with the same set
+    won't return it again.
 
     params:
     -------
     column_name: str - The name of the column that may cause conflicts.
-    column_list: str - A list containing the actual set of columns of the dataset
+    column_set: set - A set containing the actual set of columns of the dataset
     """
     
     ult_name = column_name
     copy_count = 1 # one means original :), the name won't change
-    while ult_name in column_list:
+    while ult_name in column_set:
         copy_count += 1
         ult_name = f"{column_name}_{copy_count}"
 
+    column_set.add(ult_name)
     return ult_name
         
 
+@nb.njit('void(i8[:], i8[:], b1[:])', parallel=True, cache=True)
+def mark_isin_numba(left_codes, right_codes, out_mask):
+    """
+    mark_isin_numba
+    ---------------
+    Numba version of `isin` for categorical codes that share the same
+    categories. The codes are small integers, so a boolean lookup array works
+    as a hashset, it is built once and then probed in parallel.
+    Null values have the -1 code, just like in pandas they match each other.
+
+    params:
+    -------
+    left_codes: np.ndarray[int64] - Codes of the origin index
+    right_codes: np.ndarray[int64] - Codes of the partner index
+    out_mask: np.ndarray[bool] - Output, True where the left code is a match
+    """
+    max_code = -1
+    for code in right_codes:
+        max_code = max(max_code, code)
+    # Shifted by one, so the -1 (null) code gets the first position
+    lookup = np.zeros(max_code + 2, dtype=np.bool_)
+    for code in right_codes:
+        lookup[code + 1] = True
+
+    for i in nb.prange(left_codes.shape[0]):
+        code = left_codes[i] + 1
+        out_mask[i] = code < lookup.shape[0] and lookup[code]
+
+
+def encode_index_columns(dataset_a: pd.DataFrame, dataset_b: pd.DataFrame,
+                         index_column_a: str, index_column_b: str
+                         ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    encode_index_columns
+    --------------------
+    Casts both index columns to the same categorical dtype, so `isin` and the
+    merge compare integer codes instead of hashing every string again. The
+    datasets are returned untouched if any of the index columns is missing.
+
+    params:
+    -------
+    dataset_a: pd.DataFrame - Origin Dataset
+    dataset_b: pd.Dataframe - Partner Dataset
+    index_column_a: str - Name of the column where the origin objects index exists
+    index_column_b: str - Name of the column where the partner objects index exist
+    """
+    if index_column_a not in dataset_a or index_column_b not in dataset_b:
+        return dataset_a, dataset_b
+
+    all_keys = pd.concat([dataset_a[index_column_a], dataset_b[index_column_b]],
+                         ignore_index=True)
+    # Categories can't be null, nulls are encoded as the -1 code anyway
+    shared_dtype = pd.CategoricalDtype(categories=all_keys.dropna().unique())
+    dataset_a = dataset_a.assign(**{
+            index_column_a: dataset_a[index_column_a].astype(shared_dtype)
+        })
+    dataset_b = dataset_b.assign(**{
+            index_column_b: dataset_b[index_column_b].astype(shared_dtype)
+        })
+
+    return dataset_a, dataset_b
+
+
+def get_partner_keys(dataset_b: pd.DataFrame, 
+                     index_column_b: str) -> pd.Index:
+    """
+    get_partner_keys
+    ----------------
+    Builds an index with the unique keys of the partner dataset. The index
+    hashtable is built only once, so it can be reused by every `mark_matches`
+    call (e.g. every chunk in lazy load mode).
+
+    params:
+    -------
+    dataset_b: pd.Dataframe - Partner Dataset
+    index_column_b: str - Name of the column where the partner objects index exist
+    """
+    if not index_column_b in dataset_b:
+        raise SystemExit(
+                "The index column name for the partner file is invalid"
+            )
+
+    return pd.Index(dataset_b[index_column_b].unique())
+
+
+def get_results_array(match_mask: np.ndarray|pa.Array|pa.ChunkedArray, 
+                      match_marker: str,
+                      missmatch_marker: int|str) -> pa.DictionaryArray:
+    """
+    get_results_array
+    -----------------
+    Builds the results column as a dictionary encoded Arrow array, every row
+    is a single byte pointing to one of the two markers, instead of a 
+    full string per row.
+
+    params:
+    -------
+    match_mask: np.ndarray|pa.Array|pa.ChunkedArray - True where the origin row 
+    is a match
+    match_marker: str - Symbol or number to use to mark matches
+    missmatch_marker: str - Symbol or number to use to mark missmatches
+    """
+    if isinstance(match_mask, pa.ChunkedArray):
+        match_mask = match_mask.combine_chunks()
+    elif not isinstance(match_mask, pa.Array):
+        match_mask = pa.array(match_mask, type=pa.bool_())
+    # False (0) points to the missmatch marker and True (1) to the match one
+    markers = pa.array([str(missmatch_marker), str(match_marker)])
+    return pa.DictionaryArray.from_arrays(match_mask.cast(pa.int8()), markers)
+
+
 def mark_matches(dataset_a: pd.DataFrame, dataset_b: pd.DataFrame,
                  index_column_a: str, index_column_b: str, 
                  result_column_name: str, match_marker: str, 
                  missmatch_marker: int|str, 
-                 drop_missmatches: bool=False) -> pd.DataFrame:
+                 drop_missmatches: bool=False,
+                 partner_keys: pd.Index|None=None) -> pd.DataFrame:
     """
     mark_matches
     ------------
@@ -144,6 +299,8 @@ def mark_matches(dataset_a: pd.DataFrame, dataset_b: pd.DataFrame,
     result_column_name: str - Name to asign to the results column
     match_marker: str - Symbol or number to use to mark matches
     missmatch_marker: str - Symbol or number to use to mark missmatches
+    drop_missmatches: bool - Remove the rows that did not match
+    partner_keys: pd.Index - Keys from `get_partner_keys`, built if missing
     """
     # Check if both index columns for origin and partner exist
     if not index_column_a in dataset_a:
@@ -151,33 +308,161 @@ def mark_matches(dataset_a: pd.DataFrame, dataset_b: pd.DataFrame,
                 "The index column name for the origin file is invalid"
             )
 
-    if not index_column_b in dataset_b:
+    if partner_keys is None:
+        partner_keys = get_partner_keys(dataset_b=dataset_b,
+                                        index_column_b=index_column_b)
+
+    index_a = dataset_a.loc[:,index_column_a]
+    # Both keys were encoded by `encode_index_columns`, compare their codes
+    if (isinstance(index_a.dtype, pd.CategoricalDtype) 
+        and index_a.dtype == partner_keys.dtype):
+        match_mask = np.empty(len(index_a), dtype=np.bool_)
+        mark_isin_numba(index_a.cat.codes.to_numpy(dtype=np.int64),
+                        np.asarray(partner_keys.codes, dtype=np.int64),
+                        match_mask)
+    elif (isinstance(index_a.dtype, pd.ArrowDtype) 
+          and isinstance(partner_keys.dtype, pd.ArrowDtype)):
+        # Same type rules as the Arrow batches, isin alone casts texts to 
+        # numbers and fails with empty columns
+        aligned_keys = align_key_types(pa.array(index_a.array), 
+                                       pa.array(partner_keys.array))
+        if aligned_keys is not None:
+            match_mask = pc.is_in(aligned_keys[0], 
+                                  value_set=aligned_keys[1]).to_numpy(
+                                      zero_copy_only=False
+                                  )
+        else:
+            match_mask = np.zeros(len(index_a), dtype=np.bool_)
+    else:
+        # Arrow columns can't be compared with keys that mix texts and numbers
+        if isinstance(index_a.dtype, pd.ArrowDtype):
+            index_a = index_a.astype(object)
+        match_mask = index_a.isin(partner_keys).to_numpy(dtype=np.bool_)
+        # None, NaN and NA are different objects, but all of them are empty
+        if partner_keys.hasnans:
+            match_mask = match_mask | index_a.isna().to_numpy(dtype=np.bool_)
+    # assign returns a new frame, the caller's dataset is left untouched
+    results = get_results_array(match_mask=match_mask, 
+                                match_marker=match_marker,
+                                missmatch_marker=missmatch_marker)
+    dataset_a = dataset_a.assign(**{
+            result_column_name: pd.arrays.ArrowExtensionArray(results)
+        })
+
+    # Remove missmatches
+    if drop_missmatches:
+        dataset_a = dataset_a.iloc[match_mask]
+
+    return dataset_a
+
+
+def get_partner_key_array(partner_keys: pd.Index) -> pa.Array|None:
+    """
+    get_partner_key_array
+    ---------------------
+    Converts the partner keys from `get_partner_keys` into an Arrow array for
+    `mark_matches_batch`. Returns None if Arrow can't hold them (e.g. keys
+    that mix text and numbers).
+
+    params:
+    -------
+    partner_keys: pd.Index - Keys from `get_partner_keys`
+    """
+    try:
+        return pa.array(partner_keys.array, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+def align_key_types(index_a: pa.Array|pa.ChunkedArray,
+                    index_b: pa.Array|pa.ChunkedArray) -> tuple|None:
+    """
+    align_key_types
+    ---------------
+    Casts both Arrow index columns to a type they can be compared with.
+    Keys with a different type never match, just like in pandas, except
+    numbers (1 == 1.0, two integer keys stay integers), texts and empty
+    columns. Returns None if both keys can't be compared.
+
+    params:
+    -------
+    index_a: pa.Array|pa.ChunkedArray - Origin index column
+    index_b: pa.Array|pa.ChunkedArray - Partner index column
+    """
+    is_number = lambda x: pa.types.is_integer(x) or pa.types.is_floating(x)
+    is_text = lambda x: pa.types.is_string(x) or pa.types.is_large_string(x)
+    key_types = (index_a.type, index_b.type)
+    if all(pa.types.is_integer(x) for x in key_types):
+        # float64 can't hold every integer above 2**53
+        if index_a.type.equals(index_b.type):
+            return index_a, index_b
+        return index_a.cast(pa.int64()), index_b.cast(pa.int64())
+    elif all(is_number(x) for x in key_types):
+        # Same precision as pandas when it compares integers with floats
+        return (index_a.cast(pa.float64(), safe=False), 
+                index_b.cast(pa.float64(), safe=False))
+    elif all(is_text(x) for x in key_types) or pa.types.is_null(key_types[1]):
+        return index_a, index_b.cast(index_a.type)
+    elif pa.types.is_null(key_types[0]):
+        return index_a.cast(index_b.type), index_b
+    elif index_a.type.equals(index_b.type):
+        return index_a, index_b
+
+    return None
+
+
+def mark_matches_batch(batch: pa.RecordBatch|pa.Table, partner_keys: pa.Array,
+                       index_column_a: str, result_column_name: str,
+                       match_marker: str, missmatch_marker: int|str,
+                       drop_missmatches: bool=False) -> pa.RecordBatch|pa.Table:
+    """
+    mark_matches_batch
+    ------------------
+    Arrow version of `mark_matches` for the lazy load record batches (or a
+    whole table). The matches are found with `pyarrow.compute.is_in`, and the
+    missmatches are dropped before the batch becomes a DataFrame.
+
+    params:
+    -------
+    batch: pa.RecordBatch|pa.Table - Origin chunk
+    partner_keys: pa.Array - Keys from `get_partner_key_array`
+    index_column_a: str - Name of the column where the origin objects index exists
+    result_column_name: str - Name to asign to the results column
+    match_marker: str - Symbol or number to use to mark matches
+    missmatch_marker: str - Symbol or number to use to mark missmatches
+    drop_missmatches: bool - Remove the rows that did not match
+    """
+    if not index_column_a in batch.schema.names:
         raise SystemExit(
-                "The index column name for the partner file is invalid"
+                "The index column name for the origin file is invalid"
             )
 
-    mapping = {
-            True: match_marker,
-            False: missmatch_marker,
-        }
-    
-    index_a = dataset_a.loc[:,index_column_a]
-    index_b = dataset_b.loc[:, index_column_b]
-    dataset_a[result_column_name] = index_a.isin(index_b).map(
-        lambda x: mapping.get(bool(x), x)
-    )
+    aligned_keys = align_key_types(batch.column(index_column_a), partner_keys)
+    if aligned_keys is not None:
+        index_a, partner_keys = aligned_keys
+        match_mask = pc.is_in(index_a, value_set=partner_keys)
+    else:
+        match_mask = pa.repeat(False, batch.num_rows)
+
+    results = get_results_array(match_mask=match_mask, 
+                                match_marker=match_marker,
+                                missmatch_marker=missmatch_marker)
+    if result_column_name in batch.schema.names:
+        column_position = batch.schema.get_field_index(result_column_name)
+        batch = batch.set_column(column_position, result_column_name, results)
+    else:
+        batch = batch.append_column(result_column_name, results)
 
     # Remove missmatches
     if drop_missmatches:
-        match_mask = dataset_a[result_column_name] == match_marker
-        dataset_a = dataset_a.loc[match_mask]
+        batch = batch.filter(match_mask)
 
-    return dataset_a.copy()
+    return batch
 
 
 def merge_datasets(dataset_a: pd.DataFrame, dataset_b: pd.DataFrame,
                    index_column_a: str, index_column_b: str, 
-                   copy_columns: list[str|None]):
+                   copy_columns: list[str|None], sorted_keys: bool=False):
     """
     merge_datasets
     --------------
@@ -191,10 +476,13 @@ def merge_datasets(dataset_a: pd.DataFrame, dataset_b: pd.DataFrame,
     index_column_a: str - The position of the index in the left table
     index_column_b: str - The position of the index in the right table
     copy_columns: str - The array of columns to be copied
+    sorted_keys: bool - Use an ordered merge, both keys are expected to be sorted
     """
     # Half an hour debuging just to be solved by adding .copy(), smh
     needed_columns = copy_columns.copy()
     needed_columns.append(index_column_b)
+    needed_column_set = set(needed_columns)
+    copy_column_set = set(copy_columns)
     # Check if the columns exist in the partner file
     nonexistent_columns = [
             x for x in needed_columns if x not in dataset_b.columns
@@ -204,31 +492,394 @@ def merge_datasets(dataset_a: pd.DataFrame, dataset_b: pd.DataFrame,
         raise SystemExit(
                 error_message.format(cols=nonexistent_columns)
             )
-    # Drop unnecessary columns from the partner dataset
+    # Drop unnecessary columns from the partner dataset, usually there are none
+    # because main only reads the needed columns
     unneeded_partner_columns = [
-            x for x in dataset_b.columns if x not in needed_columns
+            x for x in dataset_b.columns if x not in needed_column_set
         ]
-    # This declaration is just a way to create a copy of the object
-    dataset_b = dataset_b.drop(columns=unneeded_partner_columns, inplace=False)
-    dataset_b.drop_duplicates(subset=index_column_b, inplace=True, 
-                              ignore_index=True)
+    if unneeded_partner_columns:
+        dataset_b = dataset_b.drop(columns=unneeded_partner_columns)
+    if sorted_keys:
+        try:
+            # A stable sort is almost free if the keys are already sorted
+            sorted_a = dataset_a.sort_values(index_column_a, kind="mergesort")
+            sorted_b = dataset_b.sort_values(index_column_b, kind="mergesort",
+                                             ignore_index=True)
+        except TypeError:
+            # Keys that mix texts and numbers can't be sorted, use the hashtable
+            sorted_keys = False
+        else:
+            dataset_a = sorted_a
+            # Sorted duplicates are next to each other, keep the first of them
+            partner_index = sorted_b[index_column_b]
+            first_mask = partner_index.ne(partner_index.shift()).fillna(True)
+            # Empty keys never equal each other, keep only the first of them
+            null_mask = partner_index.isna()
+            first_mask &= ~(null_mask & null_mask.shift(fill_value=False))
+            dataset_b = sorted_b.loc[first_mask]
+    if not sorted_keys:
+        # Not in place, dataset_b may still be the caller's frame
+        first_mask = ~dataset_b[index_column_b].duplicated(keep="first")
+        dataset_b = dataset_b.loc[first_mask]
     # Small fix to avoid duplicated columns
     new_columns_set = list()
+    # Built once, every new name is added by avoid_similar_columns, so the
+    # copy columns can't take the name of the partner index either
+    existing_columns = set(dataset_a.columns)
+    existing_columns.update(
+            x for x in dataset_b.columns if x not in copy_column_set
+        )
     # Remove the index column from this proccess, otherwise the name may change 
     for column in dataset_b.columns:
-        if column in copy_columns:
+        if column in copy_column_set:
             column = avoid_similar_columns(column_name=str(column), 
-                                           column_list=list(dataset_a.columns))
+                                           column_set=existing_columns)
         new_columns_set.append(column)
 
     dataset_b.columns = new_columns_set
 
     # Let's merge
+    if sorted_keys:
+        # Linear merge over the sorted keys, no hashtable needed
+        return pd.merge_ordered(left=dataset_a, right=dataset_b, 
+                                left_on=index_column_a, 
+                                right_on=index_column_b, how="left")
+
     result_df = pd.merge(left=dataset_a, right=dataset_b, left_on=index_column_a,
-                      right_on=index_column_b, how="left")
+                      right_on=index_column_b, how="left", validate="m:1")
     return result_df
 
 
+def uppercase_dictionary(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    uppercase_dictionary
+    --------------------
+    Uppercases a dictionary encoded text column, only the dictionary of every
+    chunk is changed, the rows keep pointing to the same positions.
+
+    params:
+    -------
+    values: pa.ChunkedArray - Dictionary encoded column with text values
+    """
+    return pa.chunked_array([
+            pa.DictionaryArray.from_arrays(x.indices, 
+                                           pc.utf8_upper(x.dictionary))
+            for x in values.chunks
+        ], type=values.type)
+
+
+def uppercase_dataset(dataset: pd.DataFrame) -> pd.DataFrame:
+    """
+    uppercase_dataset
+    -----------------
+    Sets all the text fields of the dataset (including the header) to
+    uppercase. Text columns are uppercased with the vectorized `.str.upper()`,
+    only object columns that mix text with other types are mapped cell by cell.
+
+    params:
+    -------
+    dataset: pd.DataFrame - The dataset to be uppercased
+    """
+    to_upper = lambda x: str(x).upper() if isinstance(x, str) else x
+    upper_columns = dict()
+    for column in dataset.columns:
+        values = dataset[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Only the categories are mapped
+            upper_columns[column] = values.map(to_upper)
+        elif values.dtype == object:
+            if pd.api.types.infer_dtype(values, skipna=True) == "string":
+                values = values.astype("string[pyarrow]").str.upper()
+            else:
+                values = values.map(to_upper)
+            upper_columns[column] = values
+        elif pd.api.types.is_string_dtype(values.dtype):
+            upper_columns[column] = values.str.upper()
+        elif (isinstance(values.dtype, pd.ArrowDtype) 
+              and pa.types.is_dictionary(values.dtype.pyarrow_dtype)):
+            # Only the dictionary is uppercased (e.g. the results column)
+            value_type = values.dtype.pyarrow_dtype.value_type
+            if pa.types.is_string(value_type) or pa.types.is_large_string(
+                    value_type):
+                arrow_values = pa.array(values)
+                # Concatenated chunks keep one dictionary per chunk
+                if isinstance(arrow_values, pa.Array):
+                    arrow_values = pa.chunked_array([arrow_values])
+                upper_columns[column] = pd.Series(
+                        pd.arrays.ArrowExtensionArray(
+                            uppercase_dictionary(arrow_values)
+                        ),
+                        index=values.index
+                    )
+
+    dataset = dataset.assign(**upper_columns)
+    dataset.columns = dataset.columns.map(to_upper)
+    return dataset
+
+
+def polars_key_type(type_a: pl.DataType, type_b: pl.DataType) -> pl.DataType|None:
+    """
+    polars_key_type
+    ---------------
+    Polars version of `align_key_types`, returns the type both index columns
+    are cast to before the join, or None if both keys can't be compared.
+
+    params:
+    -------
+    type_a: pl.DataType - Type of the origin index column
+    type_b: pl.DataType - Type of the partner index column
+    """
+    key_types = (type_a, type_b)
+    if all(x.is_integer() for x in key_types):
+        return type_a if type_a == type_b else pl.Int64
+    elif all(x.is_numeric() for x in key_types):
+        return pl.Float64
+    elif type_b == pl.Null:
+        return type_a
+    elif type_a == pl.Null or type_a == type_b:
+        return type_b
+
+    return None
+
+
+def polars_mark_and_merge(dataset_a: pl.LazyFrame, dataset_b: pl.LazyFrame,
+                          index_column_a: str, index_column_b: str,
+                          result_column_name: str, match_marker: str,
+                          missmatch_marker: str, copy_columns: list[str],
+                          drop_missmatches: bool=False) -> pl.LazyFrame:
+    """
+    polars_mark_and_merge
+    ---------------------
+    Polars version of `mark_matches` + `merge_datasets`. Builds a single lazy
+    query where the matches are marked and the copy columns are merged by the
+    same left join, so Polars can run it multi-threaded and in streaming mode.
+
+    params:
+    -------
+    dataset_a: pl.LazyFrame - Origin Dataset
+    dataset_b: pl.LazyFrame - Partner Dataset
+    index_column_a: str - Name of the column where the origin objects index exists
+    index_column_b: str - Name of the column where the partner objects index exist
+    result_column_name: str - Name to asign to the results column
+    match_marker: str - Symbol or number to use to mark matches
+    missmatch_marker: str - Symbol or number to use to mark missmatches
+    copy_columns: list[str] - The array of columns to be copied
+    drop_missmatches: bool - Remove the rows that did not match
+    """
+    schema_a = dataset_a.collect_schema()
+    schema_b = dataset_b.collect_schema()
+    # Same checks as the pandas functions
+    if not index_column_a in schema_a:
+        raise SystemExit(
+                "The index column name for the origin file is invalid"
+            )
+
+    if not index_column_b in schema_b:
+        raise SystemExit(
+                "The index column name for the partner file is invalid"
+            )
+
+    nonexistent_columns = [x for x in copy_columns if x not in schema_b]
+    if nonexistent_columns:
+        error_message = "The following columns do not appear in the partner file: {cols}"
+        raise SystemExit(
+                error_message.format(cols=nonexistent_columns)
+            )
+
+    # Rename the copy columns just like `merge_datasets` does, the results
+    # column and the partner index are taken too
+    existing_columns = set(schema_a.names())
+    existing_columns.add(result_column_name)
+    if index_column_b not in copy_columns:
+        existing_columns.add(index_column_b)
+    renamed_columns = {
+            column: avoid_similar_columns(column_name=column,
+                                          column_set=existing_columns)
+            for column in schema_b.names() if column in copy_columns
+        }
+    # The partner index is copied under a temporal name, next to a flag that
+    # stays empty on every row that did not find a partner (an empty partner
+    # index may be a match too)
+    match_column = avoid_similar_columns(column_name=f"{index_column_b}_match",
+                                         column_set=existing_columns)
+    found_column = avoid_similar_columns(column_name=f"{index_column_b}_found",
+                                         column_set=existing_columns)
+    dataset_b = (
+        dataset_b
+        .select([
+            pl.col(index_column_b).alias(match_column),
+            pl.lit(True).alias(found_column),
+        ] + [
+            pl.col(column).alias(new_name)
+            for column, new_name in renamed_columns.items()
+        ])
+        .unique(subset=match_column, keep="first", maintain_order=True)
+    )
+    # Both keys must share the same type to be joined
+    key_type = polars_key_type(schema_a[index_column_a], 
+                               schema_b[index_column_b])
+    if key_type is None:
+        # Keys with a different type never match, just like in pandas
+        key_type = schema_a[index_column_a]
+        dataset_b = dataset_b.filter(pl.lit(False))
+
+    # Let's merge
+    result_lf = dataset_a.join(dataset_b, 
+                               left_on=pl.col(index_column_a).cast(key_type),
+                               right_on=pl.col(match_column).cast(key_type,
+                                                                  strict=False),
+                               how="left", coalesce=False,
+                               maintain_order="left", nulls_equal=True)
+    is_match = pl.col(found_column).is_not_null()
+
+    # Remove missmatches
+    if drop_missmatches:
+        result_lf = result_lf.filter(is_match)
+
+    result_lf = result_lf.with_columns(
+            pl.when(is_match)
+            .then(pl.lit(str(match_marker)))
+            .otherwise(pl.lit(str(missmatch_marker)))
+            .alias(result_column_name)
+        )
+
+    # Keep the same columns as the pandas pipeline
+    output_columns = [pl.col(x) for x in schema_a.names()]
+    if result_column_name not in schema_a:
+        output_columns.append(pl.col(result_column_name))
+    if copy_columns:
+        # The partner columns keep the partner file order
+        for column in schema_b.names():
+            if column in renamed_columns:
+                output_columns.append(pl.col(renamed_columns[column]))
+            elif column == index_column_b and column not in schema_a:
+                output_columns.append(
+                        pl.col(match_column).alias(index_column_b)
+                    )
+
+    return result_lf.select(output_columns)
+
+
+def arrow_mark_and_merge(dataset_a: pa.Table, dataset_b: pa.Table,
+                         index_column_a: str, index_column_b: str,
+                         result_column_name: str, match_marker: str,
+                         missmatch_marker: str, copy_columns: list[str],
+                         drop_missmatches: bool=False) -> pa.Table:
+    """
+    arrow_mark_and_merge
+    --------------------
+    Arrow version of `mark_matches` + `merge_datasets`. The matches are marked
+    by `mark_matches_batch` and the copy columns are gathered with the position
+    of every origin key in the partner keys, so every step works over columnar
+    buffers.
+
+    params:
+    -------
+    dataset_a: pa.Table - Origin Dataset
+    dataset_b: pa.Table - Partner Dataset
+    index_column_a: str - Name of the column where the origin objects index exists
+    index_column_b: str - Name of the column where the partner objects index exist
+    result_column_name: str - Name to asign to the results column
+    match_marker: str - Symbol or number to use to mark matches
+    missmatch_marker: str - Symbol or number to use to mark missmatches
+    copy_columns: list[str] - The array of columns to be copied
+    drop_missmatches: bool - Remove the rows that did not match
+    """
+    # Same checks as the pandas functions
+    if not index_column_b in dataset_b.column_names:
+        raise SystemExit(
+                "The index column name for the partner file is invalid"
+            )
+
+    nonexistent_columns = [
+            x for x in copy_columns if x not in dataset_b.column_names
+        ]
+    if nonexistent_columns:
+        error_message = "The following columns do not appear in the partner file: {cols}"
+        raise SystemExit(
+                error_message.format(cols=nonexistent_columns)
+            )
+
+    result_table = mark_matches_batch(
+            batch=dataset_a,
+            partner_keys=pc.unique(dataset_b.column(index_column_b)),
+            index_column_a=index_column_a,
+            result_column_name=result_column_name,
+            match_marker=match_marker,
+            missmatch_marker=missmatch_marker,
+            drop_missmatches=drop_missmatches,
+        )
+    if not copy_columns:
+        return result_table
+
+    # Rename the copy columns just like `merge_datasets` does, the partner 
+    # index is taken unless it's a copy column, the columns keep the partner
+    # file order
+    existing_columns = set(result_table.column_names)
+    if index_column_b not in copy_columns:
+        existing_columns.add(index_column_b)
+    partner_columns = dict()
+    for column in dataset_b.column_names:
+        if column in copy_columns:
+            partner_columns[column] = avoid_similar_columns(
+                    column_name=column, column_set=existing_columns
+                )
+        elif (column == index_column_b 
+              and column not in result_table.column_names):
+            partner_columns[column] = column
+    # Keep the first row of every partner key
+    row_column = avoid_similar_columns(column_name="__row__", 
+                                       column_set=set(dataset_b.column_names))
+    dataset_b = dataset_b.append_column(
+            row_column, pa.array(np.arange(dataset_b.num_rows))
+        )
+    first_rows = dataset_b.group_by(index_column_b).aggregate(
+            [(row_column, "min")]
+        ).column(f"{row_column}_min")
+    dataset_b = dataset_b.take(first_rows)
+
+    # Let's merge, position of every origin key in the unique partner keys
+    aligned_keys = align_key_types(result_table.column(index_column_a), 
+                                   dataset_b.column(index_column_b))
+    if aligned_keys is not None:
+        partner_rows = pc.index_in(aligned_keys[0], value_set=aligned_keys[1])
+    else:
+        partner_rows = pa.nulls(result_table.num_rows, pa.int32())
+
+    for column, new_name in partner_columns.items():
+        result_table = result_table.append_column(
+                new_name, dataset_b.column(column).take(partner_rows)
+            )
+
+    return result_table
+
+
+def uppercase_table(table: pa.Table) -> pa.Table:
+    """
+    uppercase_table
+    ---------------
+    Arrow version of `uppercase_dataset`, sets all the text columns of the
+    table (including the header) to uppercase.
+
+    params:
+    -------
+    table: pa.Table - The table to be uppercased
+    """
+    is_text = lambda x: pa.types.is_string(x) or pa.types.is_large_string(x)
+    upper_columns = list()
+    for column in table.columns:
+        if is_text(column.type):
+            column = pc.utf8_upper(column)
+        elif (pa.types.is_dictionary(column.type) 
+              and is_text(column.type.value_type)):
+            column = uppercase_dictionary(column)
+        upper_columns.append(column)
+
+    return pa.Table.from_arrays(
+            upper_columns, names=[x.upper() for x in table.column_names]
+        )
+
+
 def get_filename_extension(file_path:Path) -> str:
     """Description:
     Takes a file path and returns the extension that is contained in the file
@@ -244,16 +895,44 @@ def get_filename_extension(file_path:Path) -> str:
     return file_path.suffix.strip('.') 
 
 
+def get_file_stat(file_path:Path) -> os.stat_result:
+    """Description:
+    Takes a file path and returns its status (size, modification time...).
+    Raises a SystemExit exception if the file does not exist or it is not readable.
+
+    Parameters:
+    file_path (Path): Path to the file.
+
+    Raise:
+    SystemExit: If the file does not exist, or it is not accessable.
+
+    Returns:
+    os.stat_result: Status of the file, the size is in `st_size`.
+    """
+    try:
+        file_stat = file_path.stat()
+    except OSError:
+        file_stat = None
+    # Check if the file is readable
+    if file_stat is None or not os.access(file_path, os.R_OK):
+        raise SystemExit(
+                "The file: {f} does not exist, or it is not readable.".format(
+                    f=file_path
+                )
+        )
+
+    return file_stat
+
+
 def get_real_extension(file_path:Path) -> str:
     """Description:
     Takes a file path and returns the real extension of the file using libmagic.
-    Raises a SystemExit exception if the file does not exist or it is not readable.
+    The file must exist and be readable, see `get_file_stat`.
 
     Parameters:
     file_path (Path): Path to the file whose extension will be guessed.
     
     Raise:
-    SystemExit: If the file does not exist, or it is not accessable.
     SystemExit: If the filetype is not supported. 
 
     Returns:
@@ -264,13 +943,6 @@ def get_real_extension(file_path:Path) -> str:
         "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
         "text/csv": "csv"
     }
-    # Check if the file is readable
-    if not file_path.exists or not os.access(file_path, os.R_OK):
-        raise SystemExit(
-                "The file: {f} does not exist, or it is not readable.".format(
-                    f=file_path
-                )
-        )
     # Get file extension
     file_mime = mg.from_file(file_path, mime=True)
     file_extension = MIME_EXTENSIONS.get(file_mime, None)
@@ -287,7 +959,8 @@ def get_real_extension(file_path:Path) -> str:
 
 
 def get_read_kwargs(file_path:Path|str, file_extension:str, 
-                    lazy_load:bool=False) -> dict:
+                    lazy_load:bool=False, 
+                    usecols:list|Callable|None=None) -> dict:
     """
     Description:
     Takes the file extension and returns the appropriate parameters for the 
@@ -298,6 +971,7 @@ def get_read_kwargs(file_path:Path|str, file_extension:str,
     file_path (Path|str): Path to the file to be passed inside the kwargs as input.
     file_extension (str): Input file extension (e.g., 'xlsx'). Case-insensitive.
     lazy_load (bool, default: False): If True, sets `chunksize` in kwargs for lazy loading.
+    usecols (list|Callable|None, default: None): If set, only these columns are read.
 
     Returns:
     dict: The kwargs for the appropriate Pandas read function.
@@ -313,20 +987,479 @@ def get_read_kwargs(file_path:Path|str, file_extension:str,
     # Select the correct parameter for the type file
     if file_extension == "xlsx":
         read_kwargs["io"] = file_path
+        read_kwargs["engine"] = "calamine"
+        if usecols is not None:
+            read_kwargs["usecols"] = usecols
 
     elif file_extension == "csv": 
-        read_kwargs["filepath_or_buffer"] = file_path
-        # Change chunksize if the origin file size exceeds the max size
+        # The pyarrow engine does not support chunks, so the lazy load mode
+        # uses `read_csv_batches` instead of `pd.read_csv`
         if lazy_load:
-            read_kwargs["chunksize"] = 100000 # A hundred thousand!
-            read_kwargs["low_memory"] = False # Not necessary
+            read_kwargs["input_file"] = file_path
+            read_kwargs["block_size"] = 4194304 # AKA 4MiB per chunk
+        else:
+            read_kwargs["filepath_or_buffer"] = file_path
+            read_kwargs["engine"] = "pyarrow"
+            read_kwargs["dtype_backend"] = "pyarrow"
+        if usecols is not None:
+            read_kwargs["usecols"] = usecols
 
     return read_kwargs
 
 
+def get_file_columns(file_path:Path, file_extension:str) -> list:
+    """
+    Description:
+    Reads only the header of a CSV or Excel file and returns its columns in
+    the same order they appear in the file.
+
+    Parameters:
+    file_path (Path): Path to the file whose header will be read.
+    file_extension (str): Input file extension (e.g., 'xlsx'). Case-insensitive.
+
+    Returns:
+    list: The file columns.
+    """
+    if file_extension.lower() == "xlsx":
+        header_df = pd.read_excel(file_path, nrows=0, engine="calamine")
+    else:
+        # The pyarrow engine does not support nrows
+        header_df = pd.read_csv(file_path, nrows=0)
+
+    return list(header_df.columns)
+
+
+def get_needed_columns(file_path:Path, file_extension:str, 
+                       needed_columns:set) -> list|Callable:
+    """
+    Description:
+    Returns the `usecols` that only reads the needed columns of a file, in the
+    same order they appear in the file. Excel files get a callable, so the 
+    sheet is not parsed twice just to read its header.
+
+    Parameters:
+    file_path (Path): Path to the file to be read.
+    file_extension (str): Input file extension (e.g., 'xlsx'). Case-insensitive.
+    needed_columns (set): Names of the columns to be read.
+
+    Returns:
+    list|Callable: The `usecols` for the file reader.
+    """
+    if file_extension.lower() == "xlsx":
+        return lambda column: column in needed_columns
+
+    # Neither the pyarrow engine nor pyarrow.csv support a callable
+    return [
+            x for x in get_file_columns(file_path=file_path,
+                                        file_extension=file_extension)
+            if x in needed_columns
+        ]
+
+
+def read_csv_batches(input_file: Path, block_size: int, 
+                     usecols: list|None=None) -> Iterator[pa.RecordBatch]:
+    """
+    Description:
+    Reads a CSV file with the pyarrow streaming reader and yields every block
+    as an Arrow record batch, so the matches can be marked before building
+    any DataFrame. Column types are inferred from the first block, if a later
+    block doesn't fit them the rest of the file is read in pandas chunks.
+
+    Parameters:
+    input_file (Path): Path to the CSV file.
+    block_size (int): Size in bytes of every chunk.
+    usecols (list|None, default: None): If set, only these columns are read.
+
+    Returns:
+    Iterator[pa.RecordBatch]: The file chunks.
+    """
+    read_options = pacsv.ReadOptions(block_size=block_size)
+    # Same empty cells as the normal load
+    convert_options = pacsv.ConvertOptions(include_columns=usecols,
+                                           null_values=CSV_NULL_VALUES,
+                                           strings_can_be_null=True)
+    read_rows = 0
+    chunk_rows = 100000
+    try:
+        with pacsv.open_csv(input_file, read_options=read_options,
+                            convert_options=convert_options) as reader:
+            for batch in reader:
+                read_rows += batch.num_rows
+                chunk_rows = max(batch.num_rows, 1)
+                yield batch
+        return
+    except pa.ArrowInvalid:
+        # e.g. a column of numbers with a text after the first block
+        pass
+
+    # Skip the header and the rows already read
+    chunks = pd.read_csv(input_file, 
+                         names=get_file_columns(file_path=input_file,
+                                                file_extension="csv"),
+                         header=None, skiprows=read_rows + 1, usecols=usecols,
+                         chunksize=chunk_rows)
+    for chunk in chunks:
+        yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+
+
+def write_excel_file(dataset: pd.DataFrame, save_path: Path|str, 
+                     chunk_size: int=10000) -> None:
+    """
+    Description:
+    Writes the dataset into an Excel spreadsheet using the xlsxwriter
+    `constant_memory` mode, where every row is flushed to disk as soon as the
+    next one starts, so the workbook is never fully held in memory. The
+    tradeoff is that rows must be written in order, and `DataFrame.to_excel`
+    writes column by column, so the rows are written here one by one.
+
+    Parameters:
+    dataset (pd.DataFrame): Dataset to be saved.
+    save_path (Path|str): Path to the Excel file.
+    chunk_size (int, default: 10000): Rows converted to Python objects at once.
+
+    Raise:
+    SystemExit: If the dataset (and its header) doesn't fit in a sheet.
+    """
+    # xlsxwriter ignores the rows after the sheet limit without any error
+    MAX_SHEET_ROWS = 1048576
+    if len(dataset) + 1 > MAX_SHEET_ROWS:
+        raise SystemExit(
+            "The result has {r} rows, an Excel sheet only fits {m}. Save it as a CSV file instead.".format(
+                r=len(dataset), m=MAX_SHEET_ROWS - 1
+            )
+        )
+
+    workbook_options = {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    }
+    with xw.Workbook(save_path, workbook_options) as workbook:
+        worksheet = workbook.add_worksheet()
+        # Same header style as pandas
+        header_format = workbook.add_format({
+            "bold": True, "border": 1, "align": "center", "valign": "top"
+        })
+        worksheet.write_row(0, 0, dataset.columns.map(str), header_format)
+        for start in range(0, len(dataset), chunk_size):
+            chunk = dataset.iloc[start:start + chunk_size].astype(object)
+            # Empty cells instead of NaN or NA
+            chunk = chunk.where(chunk.notna(), None)
+            rows = chunk.itertuples(index=False, name=None)
+            for row_number, row in enumerate(rows, start=start + 1):
+                worksheet.write_row(row_number, 0, row)
+
+
+def write_csv_file(dataset: pd.DataFrame, save_path: Path|str) -> None:
+    """
+    Description:
+    Writes the dataset into an UTF-8 CSV file with the multi-threaded pyarrow
+    writer, in the same format as `DataFrame.to_csv`: only the values that
+    need them are quoted. Falls back to `DataFrame.to_csv` if the dataset 
+    can't be converted to an Arrow table (e.g. object columns that mix text 
+    and numbers), if a value needs quotes, or if it has floats or booleans 
+    (pyarrow writes 2.0 as 2 and True as true). Date and time columns are 
+    written as "yyyy-mm-dd hh:mm:ss" by both writers.
+
+    Parameters:
+    dataset (pd.DataFrame): Dataset to be saved.
+    save_path (Path|str): Path to the CSV file.
+    """
+    try:
+        table = pa.Table.from_pandas(dataset, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        table = None
+
+    pandas_types = lambda x: pa.types.is_floating(x) or pa.types.is_boolean(x)
+    if table is None or any(pandas_types(x.type) for x in table.schema):
+        dataset.to_csv(save_path, index=False, encoding="UTF-8")
+        return
+
+    # pyarrow always quotes the header, so pandas writes it
+    write_options = pacsv.WriteOptions(include_header=False, 
+                                       quoting_style="none")
+    try:
+        with open(save_path, "wb") as csv_file:
+            csv_file.write(dataset.iloc[:0].to_csv(index=False).encode("UTF-8"))
+            pacsv.write_csv(table, csv_file, write_options=write_options)
+    except pa.ArrowInvalid:
+        # A value with a comma, a quote or a new line
+        dataset.to_csv(save_path, index=False, encoding="UTF-8")
+
+
+# Worker state, set once per process by `init_chunk_worker`
+_chunk_worker_kwargs: dict[str, dict[Any, Any]] = dict()
+
+
+def init_chunk_worker(mark_batch_kwargs: dict[Any, Any]|None,
+                      mark_matches_kwargs: dict[Any, Any], 
+                      merge_datasets_kwargs: dict[Any, Any]) -> None:
+    """
+    Description:
+    Initializer of the chunk worker processes. The partner dataset travels 
+    inside the kwargs, so every worker receives it only once instead of once
+    per chunk.
+
+    Parameters:
+    mark_batch_kwargs (dict|None): `mark_matches_batch` kwargs, except 
+    `batch`. If None, the matches are marked by `mark_matches`.
+    mark_matches_kwargs (dict): `mark_matches` kwargs, except `dataset_a`.
+    merge_datasets_kwargs (dict): `merge_datasets` kwargs, except `dataset_a`.
+    """
+    _chunk_worker_kwargs["mark_batch"] = mark_batch_kwargs
+    _chunk_worker_kwargs["mark_matches"] = mark_matches_kwargs
+    _chunk_worker_kwargs["merge_datasets"] = merge_datasets_kwargs
+
+
+def read_arrow_table(file_path: Path, file_extension: str,
+                     usecols: list|Callable|None=None) -> pa.Table:
+    """
+    Description:
+    Reads a CSV or Excel file into an Arrow table. CSV files are read with the
+    multi-threaded pyarrow reader, Excel files are read by calamine through
+    pandas and converted once.
+
+    Parameters:
+    file_path (Path): Path to the file to be read.
+    file_extension (str): Input file extension (e.g., 'xlsx'). Case-insensitive.
+    usecols (list|Callable|None, default: None): If set, only these columns are
+    read, CSV files need a list.
+
+    Raise:
+    SystemExit: If the Excel file can't be converted to an Arrow table.
+
+    Returns:
+    pa.Table: The file contents.
+    """
+    if file_extension.lower() == "csv":
+        # Same empty cells as pandas
+        convert_options = pacsv.ConvertOptions(include_columns=usecols,
+                                               null_values=CSV_NULL_VALUES,
+                                               strings_can_be_null=True)
+        return pacsv.read_csv(file_path, convert_options=convert_options)
+
+    read_kwargs = get_read_kwargs(file_path=file_path,
+                                  file_extension=file_extension,
+                                  usecols=usecols)
+    try:
+        return pa.Table.from_pandas(pd.read_excel(**read_kwargs), 
+                                    preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        raise SystemExit(
+            "The file: {f} has columns with mixed types, use --engine pandas instead.".format(
+                f=file_path
+            )
+        )
+
+
+def mark_and_merge_chunk(chunk: pa.RecordBatch) -> pd.DataFrame:
+    """
+    Description:
+    Marks the matches of an origin chunk and merges the copy columns, using
+    the kwargs given to `init_chunk_worker`.
+
+    Parameters:
+    chunk (pa.RecordBatch): Origin chunk.
+
+    Returns:
+    pd.DataFrame: The processed chunk.
+    """
+    mark_batch_kwargs = _chunk_worker_kwargs["mark_batch"]
+    if mark_batch_kwargs is not None:
+        chunk = mark_matches_batch(batch=chunk, **mark_batch_kwargs)
+        chunk_matches = chunk.to_pandas(types_mapper=pd.ArrowDtype)
+    else:
+        # Arrow can't hold the partner keys (they mix texts and numbers), so
+        # the chunk is compared with the default pandas types
+        chunk_matches = mark_matches(
+                dataset_a=chunk.to_pandas(), 
+                **_chunk_worker_kwargs["mark_matches"]
+            )
+    merge_datasets_kwargs = _chunk_worker_kwargs["merge_datasets"]
+    if merge_datasets_kwargs["copy_columns"]:
+        # Merge the chunk with the needed columns
+        chunk_matches = merge_datasets(dataset_a=chunk_matches,
+                                       **merge_datasets_kwargs)
+
+    return chunk_matches
+
+
+def process_chunks(chunks: Iterator[pa.RecordBatch], 
+                   mark_batch_kwargs: dict[Any, Any]|None,
+                   mark_matches_kwargs: dict[Any, Any],
+                   merge_datasets_kwargs: dict[Any, Any],
+                   max_workers: int|None=None) -> list[pd.DataFrame]:
+    """
+    Description:
+    Processes the origin chunks in parallel with a pool of processes. The
+    results keep the same order as the chunks, and only a few chunks per 
+    worker are read ahead, so the origin file is not fully loaded at once.
+
+    Parameters:
+    chunks (Iterator[pa.RecordBatch]): Origin chunks.
+    mark_batch_kwargs (dict|None): `mark_matches_batch` kwargs, except `batch`.
+    mark_matches_kwargs (dict): `mark_matches` kwargs, except `dataset_a`.
+    merge_datasets_kwargs (dict): `merge_datasets` kwargs, except `dataset_a`.
+    max_workers (int|None, default: None): Processes, the CPU count if None.
+
+    Returns:
+    list[pd.DataFrame]: The processed chunks.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_pending = max_workers * 2
+
+    result_chunks = list()
+    pending: deque[Future] = deque()
+    # Forking after pyarrow, polars or numba started their threads may hang
+    with ProcessPoolExecutor(max_workers=max_workers, 
+                             mp_context=mp.get_context("spawn"),
+                             initializer=init_chunk_worker, 
+                             initargs=(mark_batch_kwargs,
+                                       mark_matches_kwargs, 
+                                       merge_datasets_kwargs)) as executor:
+        for chunk in chunks:
+            pending.append(executor.submit(mark_and_merge_chunk, chunk))
+            if len(pending) >= max_pending:
+                result_chunks.append(pending.popleft().result())
+
+        while pending:
+            result_chunks.append(pending.popleft().result())
+
+    return result_chunks
+
+
+def run_polars_engine(sys_args: ap.Namespace, origin_extension: str,
+                      partner_extension: str) -> None:
+    """
+    Description:
+    Runs the whole script with the Polars lazy engine. Both files are scanned
+    instead of loaded, so there is no need for the lazy load chunks, the
+    streaming engine takes care of reading files bigger than the memory.
+
+    Parameters:
+    sys_args (ap.Namespace): Parsed system arguments.
+    origin_extension (str): Real extension of the origin file.
+    partner_extension (str): Real extension of the partner file.
+
+    Raise:
+    SystemExit: If any of the files is not a CSV file.
+    """
+    if origin_extension != "csv" or partner_extension != "csv":
+        raise SystemExit(
+            "The polars engine only supports CSV files, use --engine pandas instead."
+        )
+
+    print("Scanning the origin and partner files...")
+    # The types are inferred from every row, not only the first ones, and the
+    # empty cells are the same as in pandas
+    origin_lf = pl.scan_csv(sys_args.origin, infer_schema_length=None,
+                            null_values=CSV_NULL_VALUES)
+    partner_lf = pl.scan_csv(sys_args.partner, infer_schema_length=None,
+                             null_values=CSV_NULL_VALUES)
+
+    result_lf = polars_mark_and_merge(
+            dataset_a=origin_lf,
+            dataset_b=partner_lf,
+            index_column_a=sys_args.origin_index,
+            index_column_b=sys_args.partner_index,
+            result_column_name=sys_args.results_column,
+            match_marker=sys_args.match_marker,
+            missmatch_marker=sys_args.missmatch_marker,
+            copy_columns=sys_args.copy_columns,
+            drop_missmatches=sys_args.delete_missmatches,
+        )
+
+    # Change all strings to uppercase
+    if sys_args.uppercase:
+        result_lf = result_lf.with_columns(
+                pl.col(pl.String).str.to_uppercase()
+            ).rename(str.upper)
+
+    print("Saving file...")
+    if sys_args.xlsx:
+        save_file_ext = get_filename_extension(sys_args.save_file)
+        save_path = sys_args.save_file
+        if not save_file_ext == 'xlsx':
+            save_path = "{p}.xlsx".format(p=sys_args.save_file)
+        result_df = result_lf.collect(engine="streaming")
+        write_excel_file(dataset=result_df.to_pandas(
+                             use_pyarrow_extension_array=True
+                         ), save_path=save_path)
+
+    else:
+        result_lf.sink_csv(sys_args.save_file)
+
+
+def run_arrow_engine(sys_args: ap.Namespace, origin_extension: str,
+                     partner_extension: str) -> None:
+    """
+    Description:
+    Runs the whole script over Arrow tables, from the read to the write. Pandas
+    is only used to read Excel files and to save the Excel spreadsheet.
+
+    Parameters:
+    sys_args (ap.Namespace): Parsed system arguments.
+    origin_extension (str): Real extension of the origin file.
+    partner_extension (str): Real extension of the partner file.
+    """
+    print("Loading the origin file...")
+    origin_table = read_arrow_table(file_path=sys_args.origin,
+                                    file_extension=origin_extension)
+    if not sys_args.origin_index in origin_table.column_names:
+        raise SystemExit(
+                "The index column name for the origin file is invalid"
+            )
+
+    # Only the index and the copy columns are needed from the partner file
+    needed_partner_columns = set(sys_args.copy_columns)
+    needed_partner_columns.add(sys_args.partner_index)
+    partner_columns = get_needed_columns(file_path=sys_args.partner,
+                                         file_extension=partner_extension,
+                                         needed_columns=needed_partner_columns)
+    print("Loading the partner file...")
+    partner_table = read_arrow_table(file_path=sys_args.partner,
+                                     file_extension=partner_extension,
+                                     usecols=partner_columns)
+
+    result_table = arrow_mark_and_merge(
+            dataset_a=origin_table,
+            dataset_b=partner_table,
+            index_column_a=sys_args.origin_index,
+            index_column_b=sys_args.partner_index,
+            result_column_name=sys_args.results_column,
+            match_marker=sys_args.match_marker,
+            missmatch_marker=sys_args.missmatch_marker,
+            copy_columns=sys_args.copy_columns,
+            drop_missmatches=sys_args.delete_missmatches,
+        )
+
+    # Change all strings to uppercase
+    if sys_args.uppercase:
+        result_table = uppercase_table(result_table)
+
+    print("Saving file...")
+    if sys_args.xlsx:
+        save_file_ext = get_filename_extension(sys_args.save_file)
+        save_path = sys_args.save_file
+        if not save_file_ext == 'xlsx':
+            save_path = "{p}.xlsx".format(p=sys_args.save_file)
+        write_excel_file(
+                dataset=result_table.to_pandas(types_mapper=pd.ArrowDtype),
+                save_path=save_path
+            )
+
+    else:
+        write_csv_file(
+                dataset=result_table.to_pandas(types_mapper=pd.ArrowDtype),
+                save_path=sys_args.save_file
+            )
+
+
 def main():
     # App Constants
     SYS_ARGS = get_system_args()
+    if SYS_ARGS.jobs is not None and SYS_ARGS.jobs < 1:
+        raise SystemExit("The number of jobs must be at least 1")
 
     # Get both origin and partner files location
     ORIGIN_PATH = SYS_ARGS.origin 
@@ -344,15 +1477,33 @@ def main():
     # AKA 14MiB
     MAX_BYTES_SIZE = 14680064
 
+    # Check if both files exist and if they are readable, the origin status is
+    # kept for its size
+    ORIGIN_STAT = get_file_stat(ORIGIN_PATH)
+    get_file_stat(PARTNER_PATH)
+
     # Check the file extension for both the origin and partner files.
-    # This function checks if the file exists and if it is readable, too.
-    # Also checks if the file mime is compatible (Too many responsabilities...).
+    # Also checks if the file mime is compatible.
     ORIGIN_EXTENSION = get_real_extension(ORIGIN_PATH)
     PARTNER_EXTENSION = get_real_extension(PARTNER_PATH)
+
+    if SYS_ARGS.engine == "polars":
+        run_polars_engine(sys_args=SYS_ARGS,
+                          origin_extension=ORIGIN_EXTENSION,
+                          partner_extension=PARTNER_EXTENSION)
+        return
+
+    if SYS_ARGS.engine == "arrow":
+        run_arrow_engine(sys_args=SYS_ARGS,
+                         origin_extension=ORIGIN_EXTENSION,
+                         partner_extension=PARTNER_EXTENSION)
+        return
+
     # Read the origin file size in bytes.
-    ORIGIN_BYTESIZE = os.path.getsize(ORIGIN_PATH)
-    # If the origin file should be read with lazy loading
-    ORIGIN_LAZY_LOAD = ORIGIN_BYTESIZE >= MAX_BYTES_SIZE
+    ORIGIN_BYTESIZE = ORIGIN_STAT.st_size
+    # If the origin file should be read with lazy loading (CSV only)
+    ORIGIN_LAZY_LOAD = (ORIGIN_BYTESIZE >= MAX_BYTES_SIZE 
+                        and ORIGIN_EXTENSION == "csv")
 
     # Select the correct kwargs for the origin type file
     origin_read_kwargs = get_read_kwargs(file_path=ORIGIN_PATH, 
@@ -361,18 +1512,41 @@ def main():
 
     # Apply kwargs and select the correct function according to the file type
     print("Loading the origin file...")
-    origin_df = READ_FUNCTIONS[ORIGIN_EXTENSION](**origin_read_kwargs)
+    origin_read_function = READ_FUNCTIONS[ORIGIN_EXTENSION]
+    if ORIGIN_LAZY_LOAD:
+        origin_read_function = read_csv_batches
+    origin_df = origin_read_function(**origin_read_kwargs)
 
     # Set the correct kwargs for the partner type file 
+    # Only the index and the copy columns are needed from the partner file,
+    # the missing ones are reported later by mark_matches and merge_datasets
+    needed_partner_columns = set(SYS_ARGS.copy_columns)
+    needed_partner_columns.add(SYS_ARGS.partner_index)
+    partner_columns = get_needed_columns(file_path=PARTNER_PATH,
+                                         file_extension=PARTNER_EXTENSION,
+                                         needed_columns=needed_partner_columns)
     partner_read_kwargs = get_read_kwargs(file_path=PARTNER_PATH,
                                           file_extension=PARTNER_EXTENSION,
-                                          lazy_load=False) # <- Not supported
+                                          lazy_load=False, # <- Not supported
+                                          usecols=partner_columns) 
       
     print("Loading the partner file...")
     partner_df = READ_FUNCTIONS[PARTNER_EXTENSION](**partner_read_kwargs)
+    # The ordered merge needs the keys sorted by value, not by category code
+    if not ORIGIN_LAZY_LOAD and not SYS_ARGS.sorted_keys:
+        origin_df, partner_df = encode_index_columns(
+                dataset_a=origin_df,
+                dataset_b=partner_df,
+                index_column_a=SYS_ARGS.origin_index,
+                index_column_b=SYS_ARGS.partner_index
+            )
+    # Hashed only once and shared by every mark_matches call
+    partner_keys = get_partner_keys(dataset_b=partner_df,
+                                    index_column_b=SYS_ARGS.partner_index)
     
     mark_matches_kwargs: dict[Any, Any] = {
             "dataset_b":partner_df,
+            "partner_keys":partner_keys,
             "index_column_a":SYS_ARGS.origin_index,
             "index_column_b":SYS_ARGS.partner_index,
             "result_column_name":SYS_ARGS.results_column,
@@ -385,24 +1559,35 @@ def main():
             "dataset_b":partner_df,
             "index_column_a":SYS_ARGS.origin_index,
             "index_column_b":SYS_ARGS.partner_index,
-            "copy_columns":SYS_ARGS.copy_columns
+            "copy_columns":SYS_ARGS.copy_columns,
+            "sorted_keys":SYS_ARGS.sorted_keys,
         }
 
-    result_df = pd.DataFrame()
-
     if ORIGIN_LAZY_LOAD:
         print("Your origin file seems heavy, reading in lazy load mode...")
-        for chunk in origin_df:
-            # Find the chunk matches
-            mark_matches_kwargs["dataset_a"] = chunk
-            chunk_matches = mark_matches(**mark_matches_kwargs)
-            if SYS_ARGS.copy_columns:
-                # Merge the chunk with the needed columns
-                merge_datasets_kwargs["dataset_a"] = chunk_matches
-                chunk_matches = merge_datasets(**merge_datasets_kwargs)
-
-            # Append the chunk to the final result
-            result_df = pd.concat([result_df, chunk_matches])
+        # The chunks are marked as Arrow batches whenever it's possible
+        partner_key_array = get_partner_key_array(partner_keys)
+        mark_batch_kwargs: dict[Any, Any]|None = None
+        if partner_key_array is not None:
+            mark_batch_kwargs = {
+                "partner_keys":partner_key_array,
+                "index_column_a":SYS_ARGS.origin_index,
+                "result_column_name":SYS_ARGS.results_column,
+                "match_marker":SYS_ARGS.match_marker,
+                "missmatch_marker":SYS_ARGS.missmatch_marker,
+                "drop_missmatches":SYS_ARGS.delete_missmatches,
+            }
+        # Every chunk is processed by a worker, all of them are concatenated 
+        # at once later
+        result_chunks = process_chunks(
+                chunks=origin_df,
+                mark_batch_kwargs=mark_batch_kwargs,
+                mark_matches_kwargs=mark_matches_kwargs,
+                merge_datasets_kwargs=merge_datasets_kwargs,
+                max_workers=SYS_ARGS.jobs
+            )
+
+        result_df = pd.concat(result_chunks, ignore_index=True)
     else:
         print("Reading origin file in normal mode...")
         # Find the origin file matches
@@ -416,9 +1601,7 @@ def main():
 
     # Change all strings to uppercase (random requirement, lol)
     if SYS_ARGS.uppercase:
-        to_upper = lambda x: str(x).upper() if isinstance(x, str) else x
-        result_df = result_df.map(to_upper)
-        result_df.columns = [to_upper(x) for x in result_df.columns]
+        result_df = uppercase_dataset(result_df)
    
     print("Saving file...")
     if SYS_ARGS.xlsx:
@@ -426,11 +1609,10 @@ def main():
         save_path = SAVE_PATH
         if not save_file_ext == 'xlsx':
             save_path = "{p}.xlsx".format(p=SAVE_PATH)
-        with pd.ExcelWriter(save_path, engine='xlsxwriter') as excel_writer:
-            result_df.to_excel(excel_writer, index=False)
+        write_excel_file(dataset=result_df, save_path=save_path)
 
     else:
-        result_df.to_csv(SAVE_PATH, index=False, encoding="UTF-8")
+        write_csv_file(dataset=result_df, save_path=SAVE_PATH)
 
 
 if __name__ == "__main__":
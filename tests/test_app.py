@@ -0,0 +1,191 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import app
+
+
+class MarkAndMergeChunkTest(unittest.TestCase):
+
+    def test_mixed_partner_keys(self):
+        partner = pd.DataFrame({"code": ["abc", 3, "6"], 
+                                "val": ["x", "y", "z"]})
+        partner_keys = app.get_partner_keys(dataset_b=partner,
+                                            index_column_b="code")
+        self.assertIsNone(app.get_partner_key_array(partner_keys))
+
+        app.init_chunk_worker(
+                mark_batch_kwargs=None,
+                mark_matches_kwargs={
+                    "dataset_b": partner,
+                    "index_column_a": "id",
+                    "index_column_b": "code",
+                    "result_column_name": "RESULTS",
+                    "match_marker": 1,
+                    "missmatch_marker": 0,
+                    "partner_keys": partner_keys,
+                },
+                merge_datasets_kwargs={
+                    "dataset_b": partner,
+                    "index_column_a": "id",
+                    "index_column_b": "code",
+                    "copy_columns": ["val"],
+                },
+            )
+        chunk = pa.record_batch({"id": [1, 3, 6], "name": ["a", "b", "c"]})
+        result = app.mark_and_merge_chunk(chunk)
+
+        self.assertEqual(result["RESULTS"].astype(str).tolist(), 
+                         ["0", "1", "0"])
+        self.assertEqual(result["val"].tolist()[1], "y")
+
+
+class LazyLoadTest(unittest.TestCase):
+
+    def test_empty_keys_match_normal_load(self):
+        partner = pd.DataFrame({"code": ["A1", None], "val": ["x", "y"]})
+        partner_keys = app.get_partner_keys(dataset_b=partner,
+                                            index_column_b="code")
+        mark_kwargs = {
+            "index_column_a": "k",
+            "result_column_name": "RESULTS",
+            "match_marker": 1,
+            "missmatch_marker": 0,
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            origin_path = Path(temp_dir) / "origin.csv"
+            origin_path.write_text("k,name\nA1,a\n,b\nNA,c\nB2,d\n")
+
+            normal = app.mark_matches(
+                    dataset_a=pd.read_csv(**app.get_read_kwargs(
+                        file_path=origin_path, file_extension="csv"
+                    )),
+                    dataset_b=partner, index_column_b="code",
+                    partner_keys=partner_keys, **mark_kwargs
+                )
+            batches = app.read_csv_batches(input_file=origin_path,
+                                           block_size=16)
+            lazy = pd.concat([
+                    app.mark_matches_batch(
+                        batch=batch,
+                        partner_keys=app.get_partner_key_array(partner_keys),
+                        **mark_kwargs
+                    ).to_pandas(types_mapper=pd.ArrowDtype)
+                    for batch in batches
+                ], ignore_index=True)
+
+        self.assertEqual(lazy["RESULTS"].astype(str).tolist(), 
+                         ["1", "1", "1", "0"])
+        self.assertEqual(lazy["RESULTS"].astype(str).tolist(), 
+                         normal["RESULTS"].astype(str).tolist())
+        self.assertEqual(lazy["k"].isna().tolist(), 
+                         normal["k"].isna().tolist())
+
+
+class EngineParityTest(unittest.TestCase):
+    """The polars and arrow engines give the same rows as the pandas one."""
+
+    merge_kwargs = {
+        "index_column_a": "k",
+        "index_column_b": "code",
+        "result_column_name": "RESULTS",
+        "match_marker": 1,
+        "missmatch_marker": 0,
+    }
+
+    @staticmethod
+    def normalize(dataset: pd.DataFrame) -> list:
+        # Same cells no matter the engine types (1 == 1.0, None == NaN)
+        def cell(value):
+            if pd.isna(value):
+                return None
+            if isinstance(value, float) and value.is_integer():
+                return str(int(value))
+            return str(value)
+
+        rows = dataset.astype(object).itertuples(index=False, name=None)
+        return [list(dataset.columns)] + [[cell(x) for x in row] for row in rows]
+
+    def pandas_result(self, origin, partner, copy_columns, drop_missmatches):
+        # Same steps as the pandas engine in `main`
+        dataset_a = origin.to_pandas(types_mapper=pd.ArrowDtype)
+        dataset_b = partner.to_pandas(types_mapper=pd.ArrowDtype)
+        dataset_a, dataset_b = app.encode_index_columns(
+                dataset_a=dataset_a, dataset_b=dataset_b,
+                index_column_a="k", index_column_b="code"
+            )
+        result = app.mark_matches(dataset_a=dataset_a, dataset_b=dataset_b,
+                                  drop_missmatches=drop_missmatches,
+                                  **self.merge_kwargs)
+        if copy_columns:
+            result = app.merge_datasets(dataset_a=result, dataset_b=dataset_b,
+                                        index_column_a="k", 
+                                        index_column_b="code",
+                                        copy_columns=copy_columns)
+        return self.normalize(result)
+
+    def assert_same_results(self, origin: pa.Table, partner: pa.Table,
+                            copy_columns: list, drop_missmatches=False):
+        expected = self.pandas_result(origin, partner, copy_columns, 
+                                      drop_missmatches)
+        arrow_result = app.arrow_mark_and_merge(
+                dataset_a=origin, dataset_b=partner, 
+                copy_columns=copy_columns, drop_missmatches=drop_missmatches,
+                **self.merge_kwargs
+            )
+        polars_result = app.polars_mark_and_merge(
+                dataset_a=pl.from_arrow(origin).lazy(), 
+                dataset_b=pl.from_arrow(partner).lazy(),
+                copy_columns=copy_columns, drop_missmatches=drop_missmatches,
+                **self.merge_kwargs
+            ).collect()
+
+        self.assertEqual(self.normalize(
+                arrow_result.to_pandas(types_mapper=pd.ArrowDtype)
+            ), expected)
+        self.assertEqual(self.normalize(
+                polars_result.to_pandas(use_pyarrow_extension_array=True)
+            ), expected)
+
+    def test_null_and_duplicated_keys(self):
+        origin = pa.table({"k": ["a", None, "b", "c"], 
+                           "name": ["n0", "n1", "n2", "n3"]})
+        partner = pa.table({"code": ["c", None, "a", "c", None],
+                            "val": ["c1", "e1", "a1", "c2", "e2"]})
+        for drop_missmatches in (False, True):
+            self.assert_same_results(origin, partner, ["val"], 
+                                     drop_missmatches=drop_missmatches)
+        self.assert_same_results(origin, partner, [])
+
+    def test_int_and_float_keys(self):
+        origin = pa.table({"k": [1, 2, 3, None]})
+        partner = pa.table({"code": [1.0, 2.5, 3.0], "val": ["x", "y", "z"]})
+        self.assert_same_results(origin, partner, ["val"])
+
+    def test_large_int_keys(self):
+        origin = pa.table({"k": [2**53 + 1, 2**53, 5]})
+        partner = pa.table({"code": [2**53 + 1, 5], "val": ["x", "y"]})
+        self.assert_same_results(origin, partner, ["val"])
+
+    def test_text_and_number_keys_never_match(self):
+        origin = pa.table({"k": [1, 2]})
+        partner = pa.table({"code": ["1", "2"], "val": ["x", "y"]})
+        self.assert_same_results(origin, partner, [])
+
+    def test_column_names(self):
+        origin = pa.table({"k": ["a", "b"], "name": ["n0", "n1"]})
+        partner = pa.table({"val": ["x", "y"], "RESULTS": ["r0", "r1"],
+                            "code": ["a", "c"], "name": ["p0", "p1"]})
+        self.assert_same_results(origin, partner, ["RESULTS", "val", "name"])
+        self.assert_same_results(origin, partner, ["code"])
+
+
+if __name__ == "__main__":
+    unittest.main()